@@ -0,0 +1,118 @@
+import requests
+import re
+import time
+import random
+import threading
+from requests.adapters import HTTPAdapter
+
+
+# One "Key: value" header per line; surrounding whitespace is dropped and
+# lines without a key, colon or value are skipped
+_HEADER_RE = re.compile(
+    r"^[^\S\n]*([^:\s][^:\n]*?)[^\S\n]*:[^\S\n]*(\S[^\n]*?)[^\S\n]*$", re.M
+)
+
+# Read uploads in 1 MiB chunks instead of http.client's 8 KiB default
+_UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Files smaller than this are read into memory once and reused across retries
+_IN_MEMORY_UPLOAD_LIMIT = 8 * 1024 * 1024
+
+
+class _ChunkedFileReader:
+    """Stream a file in large chunks while still reporting its size to requests"""
+
+    def __init__(self, file, size: int, chunk_size: int = _UPLOAD_CHUNK_SIZE):
+        self.file = file
+        self.size = size
+        self.chunk_size = chunk_size
+
+    def __len__(self) -> int:
+        # Lets requests send Content-Length instead of chunked encoding
+        return self.size
+
+    def __iter__(self):
+        return iter(lambda: self.file.read(self.chunk_size), b"")
+
+
+# Most connections kept open per host; also the ceiling on parallel chunked
+# upload parts, so no part's connection is discarded when the pool is full
+_POOL_MAXSIZE = 32
+
+# Shared session so repeated uploads from every node reuse pooled keep-alive connections
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """Return the package-wide session, creating it on first use"""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=16, pool_maxsize=_POOL_MAXSIZE, max_retries=0)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _SESSION = session
+    return _SESSION
+
+
+# Exponential backoff with jitter; a dedicated generator lets callers inject a seed
+_RETRY_RNG = random.Random()
+
+
+def _is_retryable_status(status_code: int) -> bool:
+    """Request timeouts, rate limiting and server errors may succeed on retry"""
+    return status_code in (408, 429) or status_code >= 500
+
+
+def _backoff_delay(
+    attempt: int,
+    base: float = 1.0,
+    cap: float = 30.0,
+    jitter: float = 0.5,
+    rng: random.Random = _RETRY_RNG,
+) -> float:
+    """
+    Delay before retry number `attempt` (1 for the first retry): roughly
+    base, 2*base, 4*base... +/- jitter, never more than cap
+    """
+    # Bound the exponent so large attempt counts can't overflow a float
+    delay = min(cap, base * 2 ** min(attempt - 1, 62))
+    return min(cap, delay * (1 + rng.uniform(-jitter, jitter)))
+
+
+def _retry(
+    fn,
+    max_retries: int = 3,
+    base: float = 1.0,
+    cap: float = 30.0,
+    jitter: float = 0.5,
+    rng: random.Random = _RETRY_RNG,
+):
+    """
+    Call fn() until it returns a response that should not be retried
+
+    Connection errors, timeouts and 408/429/5xx responses are retried with
+    delays from _backoff_delay. Any other exception is unrecoverable and
+    propagates immediately.
+
+    Returns:
+        The last response, or re-raises the last network error if every
+        attempt failed without one
+    """
+    for attempt in range(max_retries):
+        if attempt > 0:
+            time.sleep(_backoff_delay(attempt, base, cap, jitter, rng))
+
+        last_attempt = attempt == max_retries - 1
+        try:
+            response = fn()
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if last_attempt:
+                raise
+            continue
+
+        if last_attempt or not _is_retryable_status(response.status_code):
+            return response
@@ -4,6 +4,25 @@ import time
 from typing import List, Tuple, Any
 from pathlib import Path
 
+from ._http_common import (
+    _HEADER_RE,
+    _IN_MEMORY_UPLOAD_LIMIT,
+    _UPLOAD_CHUNK_SIZE,
+    _ChunkedFileReader,
+    _get_session,
+    _retry,
+)
+
+
+# Resolve the SSL certificate bundle once per process
+_CERT_PATHS = [
+    "/etc/ssl/certs/ca-certificates.crt",  # Common Linux location
+    "/usr/lib/ssl/cert.pem",  # Default SSL path
+]
+
+# Use system default if no cert path found
+_CERT_PATH = next((path for path in _CERT_PATHS if os.path.exists(path)), True)
+
 
 class FilestashUploadNode:
     @classmethod
@@ -58,28 +77,15 @@ class FilestashUploadNode:
         if not api_key or not share_id:
             return (400, "API key and Share ID are required")
 
-        if not os.path.exists(file_path):
+        # A single stat both checks the file exists and gives its size
+        try:
+            file_size = os.stat(file_path).st_size
+        except (OSError, ValueError):
             return (404, f"File not found: {file_path}")
 
         # Parse extra headers
         headers = self._parse_headers(extra_headers)
 
-        # Set up SSL certificate path once
-        cert_paths = [
-            "/etc/ssl/certs/ca-certificates.crt",  # Common Linux location
-            "/usr/lib/ssl/cert.pem",  # Default SSL path
-        ]
-
-        cert_path = None
-        for path in cert_paths:
-            if os.path.exists(path):
-                cert_path = path
-                break
-
-        # Use system default if no cert path found
-        if cert_path is None:
-            cert_path = True  # Use system default as last resort
-
         # Get filename from path
         filename = os.path.basename(file_path)
 
@@ -90,44 +96,41 @@ class FilestashUploadNode:
         api_endpoint = f"{filestash_url.rstrip('/')}/api/files/cat"
         params = {"path": dest_path, "key": api_key, "share": share_id}
 
-        # Attempt upload with retries
-        last_error = None
+        session = _get_session()
 
-        # Create a session with proper SSL context
-        session = requests.Session()
-        session.verify = cert_path
-
-        for attempt in range(3):
-            try:
-                # Add delay between retries (except first attempt)
-                if attempt > 0:
-                    time.sleep(1 * attempt)  # 1s, 2s delays
-
-                with open(file_path, "rb") as file:
-                    response = session.post(
+        # Attempt upload with retries
+        try:
+            with open(file_path, "rb", buffering=_UPLOAD_CHUNK_SIZE) as file:
+                # Small files are read once so retries don't go back to disk
+                body = file.read() if file_size < _IN_MEMORY_UPLOAD_LIMIT else None
+
+                def post_file():
+                    if body is None:
+                        file.seek(0)
+                    return session.post(
                         api_endpoint,
                         params=params,
-                        data=file,
+                        data=_ChunkedFileReader(file, file_size) if body is None else body,
                         headers=headers,
                         timeout=30,
+                        verify=_CERT_PATH,
                     )
 
-                # Log failed upload if log_file is specified and upload failed
-                if response.status_code != 200 and log_file.strip():
-                    self._log_failed_uploads(log_file.strip(), [file_path])
-
-                return (response.status_code, response.text)
-
-            except requests.RequestException as e:
-                last_error = f"Network error: {str(e)}"
-            except Exception as e:
-                last_error = f"Unexpected error: {str(e)}"
+                response = _retry(post_file)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            result = (500, f"Upload failed after 3 attempts - Network error: {str(e)}")
+        except requests.RequestException as e:
+            result = (500, f"Upload failed - Network error: {str(e)}")
+        except Exception as e:
+            result = (500, f"Upload failed - Unexpected error: {str(e)}")
+        else:
+            result = (response.status_code, response.text)
 
-        # If we get here, all retries failed
-        if log_file.strip():
+        # Log failed upload once, after retries are exhausted
+        if result[0] != 200 and log_file.strip():
             self._log_failed_uploads(log_file.strip(), [file_path])
 
-        return (500, f"Upload failed after 3 attempts - {last_error}")
+        return result
 
     def _log_failed_uploads(self, log_file_path: str, failed_files: List[str]):
         """Log failed upload file paths to the specified log file"""
@@ -149,23 +152,7 @@ class FilestashUploadNode:
 
     def _parse_headers(self, extra_headers: str) -> dict:
         """Parse extra headers from multiline string format"""
-        headers = {}
         if not extra_headers.strip():
-            return headers
-
-        for line in extra_headers.strip().split("\n"):
-            line = line.strip()
-            if not line or ":" not in line:
-                continue
-
-            try:
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip()
-                if key and value:
-                    headers[key] = value
-            except ValueError:
-                # Skip malformed header lines
-                continue
-
-        return headers
+            return {}
+
+        return dict(_HEADER_RE.findall(extra_headers))
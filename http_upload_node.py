@@ -1,10 +1,20 @@
 import requests
 import os
 import json
-import time
+import uuid
+from requests_toolbelt.multipart.encoder import MultipartEncoder
 from typing import Tuple, Any
 from pathlib import Path
 
+from ._http_common import (
+    _HEADER_RE,
+    _IN_MEMORY_UPLOAD_LIMIT,
+    _UPLOAD_CHUNK_SIZE,
+    _ChunkedFileReader,
+    _get_session,
+    _retry,
+)
+
 
 class HttpUploadNode:
     @classmethod
@@ -53,7 +63,10 @@ class HttpUploadNode:
         if not url.strip():
             return (400, "URL is required")
 
-        if not os.path.exists(file_path):
+        # A single stat both checks the file exists and gives its size
+        try:
+            file_size = os.stat(file_path).st_size
+        except (OSError, ValueError):
             return (404, f"File not found: {file_path}")
 
         # Parse headers
@@ -61,49 +74,62 @@ class HttpUploadNode:
 
         filename = os.path.basename(file_path)
 
-        # Attempt upload with retries
-        last_error = None
+        # Request headers are identical for every attempt, so build them once
+        if method.upper() == "POST":
+            boundary = uuid.uuid4().hex
+            request_headers = {
+                "Content-Type": f"multipart/form-data; boundary={boundary}",
+                **parsed_headers,
+            }
+        else:
+            request_headers = {"Content-Length": str(file_size), **parsed_headers}
+
+        session = _get_session()
 
-        for attempt in range(3):
-            try:
-                # Add delay between retries (except first attempt)
-                if attempt > 0:
-                    time.sleep(1 * attempt)  # 1s, 2s delays
+        # Attempt upload with retries
+        try:
+            with open(file_path, "rb", buffering=_UPLOAD_CHUNK_SIZE) as f:
+                # Small files are read once so retries don't go back to disk
+                body = f.read() if file_size < _IN_MEMORY_UPLOAD_LIMIT else None
 
-                # Prepare file for upload
-                with open(file_path, "rb") as f:
-                    files_data = {"file": (filename, f, "application/octet-stream")}
+                def send_file():
+                    if body is None:
+                        f.seek(0)
 
-                    # Make HTTP request
                     if method.upper() == "POST":
-                        response = requests.post(
+                        # Stream the multipart body instead of building it in memory
+                        encoder = MultipartEncoder(
+                            fields={"file": (filename, f if body is None else body, "application/octet-stream")},
+                            boundary=boundary,
+                        )
+                        return session.post(
                             url,
-                            files=files_data,
-                            headers=parsed_headers,
+                            data=encoder,
+                            headers=request_headers,
                             timeout=timeout,
                         )
-                    else:  # PUT
-                        response = requests.put(
+                    else:  # PUT sends the raw file as the request body, 1 MiB at a time
+                        return session.put(
                             url,
-                            files=files_data,
-                            headers=parsed_headers,
+                            data=_ChunkedFileReader(f, file_size) if body is None else body,
+                            headers=request_headers,
                             timeout=timeout,
                         )
 
-                # Return successful response immediately
-                return (response.status_code, response.text)
-
-            except requests.exceptions.Timeout:
-                last_error = f"Request timeout after {timeout} seconds"
-            except requests.exceptions.ConnectionError:
-                last_error = f"Connection error: Unable to connect to {url}"
-            except requests.exceptions.RequestException as e:
-                last_error = f"HTTP request error: {str(e)}"
-            except Exception as e:
-                last_error = f"Unexpected error: {str(e)}"
+                response = _retry(send_file)
+        except requests.exceptions.Timeout:
+            error = f"Request timeout after {timeout} seconds"
+        except requests.exceptions.ConnectionError:
+            error = f"Connection error: Unable to connect to {url}"
+        except requests.exceptions.RequestException as e:
+            return (500, f"Upload failed - HTTP request error: {str(e)}")
+        except Exception as e:
+            return (500, f"Upload failed - Unexpected error: {str(e)}")
+        else:
+            return (response.status_code, response.text)
 
         # If we get here, all retries failed
-        return (500, f"Upload failed after 3 attempts - {last_error}")
+        return (500, f"Upload failed after 3 attempts - {error}")
 
     def _parse_headers(self, headers: str) -> dict:
         """
@@ -113,7 +139,6 @@ class HttpUploadNode:
         if not headers.strip():
             return {}
 
-        parsed_headers = {}
         headers_text = headers.strip()
 
         # Try to parse as JSON first (from Load Text File node)
@@ -126,18 +151,4 @@ class HttpUploadNode:
             pass
 
         # Parse as multiline key:value format
-        for line in headers_text.split("\n"):
-            line = line.strip()
-            if not line or ":" not in line:
-                continue
-
-            try:
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip()
-                if key and value:
-                    parsed_headers[key] = value
-            except ValueError:
-                continue
-
-        return parsed_headers
+        return dict(_HEADER_RE.findall(headers_text))
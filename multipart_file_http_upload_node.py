@@ -1,17 +1,130 @@
 import requests
 import os
 import json
+import logging
+import contextlib
+import functools
+import hashlib
 import time
-import mimetypes
+import mmap
+import re
 import socket
 import urllib.parse
 import ssl
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
+from requests_toolbelt.multipart.encoder import MultipartEncoder
 from typing import Tuple, Dict, Any, Optional
 from pathlib import Path
 
+from ._http_common import _POOL_MAXSIZE, _backoff_delay, _get_session, _is_retryable_status
+
+
+log = logging.getLogger(__name__)
+
+# Content types for the file kinds ComfyUI workflows usually produce; anything
+# else is sent as application/octet-stream
+_MIME = {
+    ".mp4": "video/mp4",
+    ".webm": "video/webm",
+    ".mov": "video/quicktime",
+    ".mkv": "video/x-matroska",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+    ".wav": "audio/wav",
+    ".mp3": "audio/mpeg",
+    ".flac": "audio/flac",
+    ".json": "application/json",
+}
+
+# Read uploads through a 1 MiB buffer instead of the default 8 KiB
+_READ_BUFFER_SIZE = 1 << 20
+
+# Uploads smaller than this are dominated by latency, so don't measure their rate
+_MIN_BANDWIDTH_SAMPLE = 1024 * 1024
+
+# S3-style initiate responses carry the upload ID as <UploadId>...</UploadId>
+_UPLOAD_ID_RE = re.compile(r"<UploadId>\s*([^<\s]+)\s*</UploadId>")
+
+# Common sensitive patterns in error messages
+_SENSITIVE_PATTERNS = (
+    "Authorization:",
+    "Bearer ",
+    "api-key:",
+    "x-api-key:",
+    "token:",
+    "password:",
+    "secret:",
+)
+
+# Matches any sensitive pattern (case-insensitively) and the rest of its line
+_REDACT_RE = re.compile(
+    "(" + "|".join(map(re.escape, _SENSITIVE_PATTERNS)) + ")[^\n]*", re.IGNORECASE
+)
+
+
+class _ChunkedUploadError(Exception):
+    """A step of a chunked upload failed after exhausting its retries"""
+
+
+@contextlib.contextmanager
+def _sequential_read_hint(file):
+    """
+    Ask the kernel to read ahead aggressively while a file is uploaded, then
+    drop its pages from the cache. Does nothing where posix_fadvise is missing.
+    """
+    fadvise = getattr(os, "posix_fadvise", None)
+    if fadvise is not None:
+        with contextlib.suppress(OSError):
+            fadvise(file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    try:
+        yield file
+    finally:
+        if fadvise is not None:
+            with contextlib.suppress(OSError):
+                fadvise(file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+# Built once; ComfyUI calls INPUT_TYPES every time the node editor renders
+_INPUT_TYPES = {
+    "required": {
+        "file_path": ("STRING", {"default": ""}),
+        "url": ("STRING", {"default": "http://localhost:8000/upload"}),
+        "method": (["POST", "PUT"], {"default": "POST"}),
+        "upload_field_name": ("STRING", {"default": "file"}),
+    },
+    "optional": {
+        "headers": ("STRING", {"multiline": True, "default": ""}),
+        "secret_headers_file": ("STRING", {"default": ""}),
+        "timeout": ("INT", {"default": 30, "min": 1, "max": 300}),
+        "retry_count": ("INT", {"default": 3, "min": 1}),
+        "retry_delay": ("INT", {"default": 1, "min": 1}),
+        "max_backoff": ("INT", {"default": 30, "min": 1}),
+        "max_total_time_sec": ("INT", {"default": 3600, "min": 1}),
+        "chunk_size_mb": ("INT", {"default": 8, "min": 5, "max": 5120}),
+        "max_parallel_parts": ("INT", {"default": 4, "min": 1, "max": _POOL_MAXSIZE}),
+        "initiate_url": ("STRING", {"default": ""}),
+        "complete_url": ("STRING", {"default": ""}),
+    },
+}
+
 
 class MultipartFileHTTPUploadNode:
+    # All state is class-level; instances carry no attributes
+    __slots__ = ()
+
+    # Bytes per second achieved by the last measured upload to each host
+    _bandwidth_estimates: Dict[str, float] = {}
+
+    # Parsed secret headers per file path, keyed on (st_mtime_ns, st_size)
+    _secrets_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+    _secrets_lock = threading.Lock()
+
     @classmethod
     def _get_system_ca_bundle(cls) -> Optional[str]:
         """
@@ -65,21 +178,7 @@ class MultipartFileHTTPUploadNode:
 
     @classmethod
     def INPUT_TYPES(cls):
-        return {
-            "required": {
-                "file_path": ("STRING", {"default": ""}),
-                "url": ("STRING", {"default": "http://localhost:8000/upload"}),
-                "method": (["POST", "PUT"], {"default": "POST"}),
-                "upload_field_name": ("STRING", {"default": "file"}),
-            },
-            "optional": {
-                "headers": ("STRING", {"multiline": True, "default": ""}),
-                "secret_headers_file": ("STRING", {"default": ""}),
-                "timeout": ("INT", {"default": 30, "min": 1, "max": 300}),
-                "retry_count": ("INT", {"default": 3, "min": 1, "max": 3}),
-                "retry_delay": ("INT", {"default": 1, "min": 1, "max": 3}),
-            },
-        }
+        return _INPUT_TYPES
 
     RETURN_TYPES = ("INT", "STRING")
     RETURN_NAMES = ("status_code", "result_text")
@@ -97,6 +196,12 @@ class MultipartFileHTTPUploadNode:
         timeout: int = 30,
         retry_count: int = 3,
         retry_delay: int = 1,
+        max_backoff: int = 30,
+        max_total_time_sec: int = 3600,
+        chunk_size_mb: int = 8,
+        max_parallel_parts: int = 4,
+        initiate_url: str = "",
+        complete_url: str = "",
     ) -> Tuple[int, str]:
         """
         Send file via multipart HTTP POST/PUT request with configurable retry logic
@@ -112,10 +217,18 @@ class MultipartFileHTTPUploadNode:
             timeout: Request timeout in seconds
             retry_count: Number of retry attempts
             retry_delay: Base delay between retries in seconds
+            max_backoff: Upper bound on the delay between retries in seconds
+            max_total_time_sec: Stop retrying once another attempt can't finish within this budget
+            chunk_size_mb: Part size in MB for chunked uploads
+            max_parallel_parts: Number of parts uploaded concurrently in chunked mode
+            initiate_url: Enables chunked S3-style upload; URL that starts the upload
+            complete_url: URL that finalizes a chunked upload (defaults to url)
 
         Returns:
             Tuple of (status_code, result_text)
         """
+        deadline = time.monotonic() + max_total_time_sec
+
         # Input validation
         if not file_path.strip():
             return (400, "File path is required")
@@ -126,80 +239,347 @@ class MultipartFileHTTPUploadNode:
         if not upload_field_name.strip():
             return (400, "Upload field name is required")
 
-        if not os.path.exists(file_path):
-            return (404, f"File not found: {file_path}")
+        method = method.upper()
 
-        # Parse headers securely
+        # Opening the file doubles as the existence check
         try:
-            parsed_headers = self._parse_headers_securely(headers, secret_headers_file)
-        except Exception as e:
-            # Sanitize error message to avoid exposing secret file contents
-            return (400, f"Header parsing error - check configuration")
+            upload_file = open(file_path, "rb", buffering=_READ_BUFFER_SIZE)
+        except (FileNotFoundError, ValueError):
+            # ValueError covers paths open() rejects outright, such as embedded NUL bytes
+            return (404, f"File not found: {file_path}")
+        except OSError as e:
+            # Directories, permission errors and the like aren't a missing file
+            error_msg = f"Upload failed - Unexpected error: {self._sanitize_error_message(str(e))}"
+            log.error("Failed to upload file: %s - %s", file_path, error_msg)
+            return (500, error_msg)
 
-        # Get system certificate bundle for proper SSL verification
-        system_ca_bundle = self._get_system_ca_bundle()
+        with upload_file, _sequential_read_hint(upload_file):
+            file_size = os.fstat(upload_file.fileno()).st_size
 
-        # Detect MIME type
-        mime_type, _ = mimetypes.guess_type(file_path)
-        if mime_type is None:
-            # Default to binary for video files and unknown types
-            mime_type = "application/octet-stream"
+            # Parse headers securely
+            try:
+                parsed_headers = self._parse_headers_securely(headers, secret_headers_file)
+            except Exception as e:
+                # Sanitize error message to avoid exposing secret file contents
+                return (400, f"Header parsing error - check configuration")
+
+            # Get system certificate bundle for proper SSL verification
+            system_ca_bundle = self._get_system_ca_bundle()
+
+            if initiate_url.strip():
+                try:
+                    return self._send_chunked_upload(
+                        upload_file=upload_file,
+                        file_size=file_size,
+                        url=url,
+                        initiate_url=initiate_url.strip(),
+                        complete_url=complete_url.strip() or url,
+                        headers=parsed_headers,
+                        chunk_size=chunk_size_mb * 1024 * 1024,
+                        max_parallel_parts=max_parallel_parts,
+                        timeout=timeout,
+                        verify=system_ca_bundle if system_ca_bundle else True,
+                        retry_count=retry_count,
+                        retry_delay=retry_delay,
+                        max_backoff=max_backoff,
+                        deadline=deadline,
+                    )
+                except _ChunkedUploadError as e:
+                    error_msg = f"Chunked upload failed - {e}"
+                except Exception as e:
+                    error_msg = f"Chunked upload failed - Unexpected error: {self._sanitize_error_message(str(e))}"
+
+                log.error("Failed to upload file: %s - %s", file_path, error_msg)
+                return (500, error_msg)
+
+            # Detect MIME type
+            mime_type = _MIME.get(
+                os.path.splitext(file_path)[1].lower(), "application/octet-stream"
+            )
+
+            filename = os.path.basename(file_path)
+
+            # One key for every attempt of this upload lets the server drop duplicate retries
+            idempotency_key = hashlib.blake2b(
+                f"{file_path}:{file_size}:{url}:{time.time_ns()}".encode(), digest_size=16
+            ).hexdigest()
+            parsed_headers.setdefault("Idempotency-Key", idempotency_key)
+
+            verify = system_ca_bundle if system_ca_bundle else True
+            session = _get_session()
+
+            # Attempt upload with configurable retries
+            last_error = None
+            attempts = 0
+
+            for attempt in range(retry_count):
+                try:
+                    # Add exponential backoff between retries (except first attempt)
+                    if attempt > 0:
+                        delay = _backoff_delay(attempt, retry_delay, max_backoff)
+
+                        # Give up once another attempt can't plausibly finish within the budget
+                        estimated_time = delay + self._estimated_send_time(url, file_size)
+                        if time.monotonic() + estimated_time > deadline:
+                            last_error = f"{last_error} (retry budget of {max_total_time_sec}s exhausted)"
+                            break
+
+                        time.sleep(delay)
+
+                    # Prepare file for multipart upload, streamed from disk
+                    upload_file.seek(0)
+                    encoder = MultipartEncoder(
+                        fields={upload_field_name: (filename, upload_file, mime_type)}
+                    )
+
+                    request_headers = {
+                        "Content-Type": encoder.content_type,
+                        "Content-Length": str(encoder.len),
+                        **parsed_headers,
+                    }
+
+                    # Make HTTP request; the encoder's length comes from the known file size
+                    attempts += 1
+                    attempt_started = time.monotonic()
+                    response = session.request(
+                        method,
+                        url,
+                        data=encoder,
+                        headers=request_headers,
+                        timeout=timeout,
+                        verify=verify,
+                    )
+
+                    # Check if response indicates success (2xx status codes)
+                    if 200 <= response.status_code < 300:
+                        self._record_bandwidth(url, file_size, time.monotonic() - attempt_started)
+                        return (response.status_code, response.text)
+
+                    last_error = f"HTTP {response.status_code}: {response.text[:200]}"
+                    if not _is_retryable_status(response.status_code):
+                        # Client errors will fail the same way on every attempt
+                        break
+
+                except requests.exceptions.Timeout:
+                    last_error = f"Request timeout after {timeout} seconds"
+                except requests.exceptions.ConnectionError:
+                    last_error = f"Connection error: Unable to connect to {url}"
+                except requests.exceptions.RequestException as e:
+                    # Sanitize error message to avoid exposing sensitive information
+                    last_error = f"HTTP request error: {self._sanitize_error_message(str(e))}"
+                    break
+                except Exception as e:
+                    last_error = f"Unexpected error: {self._sanitize_error_message(str(e))}"
+                    break
+
+        # If we get here, the upload failed - log ERROR with full filepath
+        error_msg = f"Upload failed after {attempts} attempts - {last_error}"
+        log.error("Failed to upload file: %s - %s", file_path, error_msg)
+        return (500, error_msg)
 
-        filename = os.path.basename(file_path)
+    @classmethod
+    def _record_bandwidth(cls, url: str, bytes_sent: int, elapsed: float) -> None:
+        """Remember the upload rate to url's host for budgeting later retries"""
+        if bytes_sent >= _MIN_BANDWIDTH_SAMPLE and elapsed > 0:
+            host = urllib.parse.urlsplit(url).netloc.lower()
+            cls._bandwidth_estimates[host] = bytes_sent / elapsed
+
+    @classmethod
+    def _estimated_send_time(cls, url: str, size: int) -> float:
+        """
+        Seconds to send size bytes to url's host at its last measured rate;
+        0 for a host that hasn't been measured, so its retries aren't skipped
+        on a guess
+        """
+        bandwidth = cls._bandwidth_estimates.get(urllib.parse.urlsplit(url).netloc.lower())
+        return size / bandwidth if bandwidth else 0.0
+
+    def _send_chunked_upload(
+        self,
+        upload_file,
+        file_size: int,
+        url: str,
+        initiate_url: str,
+        complete_url: str,
+        headers: Dict[str, str],
+        chunk_size: int,
+        max_parallel_parts: int,
+        timeout: int,
+        verify: Any,
+        retry_count: int,
+        retry_delay: int,
+        max_backoff: int,
+        deadline: float,
+    ) -> Tuple[int, str]:
+        """
+        Upload a file in parts using the S3 multipart upload protocol
+
+        POSTs to initiate_url for an UploadId, PUTs each part to
+        url?partNumber=N&uploadId=ID in parallel, then POSTs the collected
+        ETags to complete_url?uploadId=ID. A failed part is retried on its own;
+        if a part or the completion still fails, url?uploadId=ID is DELETEd so
+        the stored parts aren't orphaned.
+        """
+        session = _get_session()
+        request_args = {"headers": headers, "timeout": timeout, "verify": verify}
+        retry_args = (retry_count, retry_delay, max_backoff, deadline)
+
+        # Start the upload and learn its ID
+        response = self._request_with_retries(
+            session, "Initiate", "POST", initiate_url, *retry_args, **request_args
+        )
+        match = _UPLOAD_ID_RE.search(response.text)
+        if match is None:
+            raise _ChunkedUploadError("Initiate response did not contain an UploadId")
+        upload_id = match.group(1)
+
+        # Split into (part_number, offset, length); an empty file is one empty part
+        parts = [
+            (part_number, offset, min(chunk_size, file_size - offset))
+            for part_number, offset in enumerate(range(0, file_size, chunk_size), start=1)
+        ] or [(1, 0, 0)]
+
+        def upload_part(fileno: int, part_number: int, offset: int, length: int) -> str:
+            step = f"Part {part_number}"
+            params = {"partNumber": part_number, "uploadId": upload_id}
+
+            if length == 0:
+                part_response = self._request_with_retries(
+                    session, step, "PUT", url, *retry_args,
+                    params=params, data=b"", **request_args
+                )
+            else:
+                # Map just this part of the file; the view is sent without copying
+                with mmap.mmap(fileno, length, access=mmap.ACCESS_READ, offset=offset) as mm:
+                    with memoryview(mm) as view:
+                        part_response = self._request_with_retries(
+                            session, step, "PUT", url, *retry_args,
+                            params=params, data=view, **request_args
+                        )
+
+            etag = part_response.headers.get("ETag")
+            if not etag:
+                raise _ChunkedUploadError(f"{step} response did not include an ETag")
+            return etag
+
+        # More workers than pooled connections would discard connections after each part
+        workers = min(max_parallel_parts, _POOL_MAXSIZE, len(parts))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(upload_part, upload_file.fileno(), *part) for part in parts]
+            try:
+                etags = [future.result() for future in futures]
+            except Exception:
+                # Don't start parts that are still queued
+                for future in futures:
+                    future.cancel()
+                # Let in-flight parts finish before telling the server to drop them
+                executor.shutdown(wait=True)
+                self._abort_chunked_upload(session, url, upload_id, request_args)
+                raise
+
+        # Finalize with the ETag of every part, in order
+        completion = "".join(
+            f"<Part><PartNumber>{part_number}</PartNumber><ETag>{escape(etag)}</ETag></Part>"
+            for part_number, etag in enumerate(etags, start=1)
+        )
+        try:
+            response = self._request_with_retries(
+                session, "Complete", "POST", complete_url, *retry_args,
+                params={"uploadId": upload_id},
+                data=f"<CompleteMultipartUpload>{completion}</CompleteMultipartUpload>".encode("utf-8"),
+                headers={**headers, "Content-Type": "application/xml"},
+                timeout=timeout,
+                verify=verify,
+            )
+        except Exception:
+            self._abort_chunked_upload(session, url, upload_id, request_args)
+            raise
+        return (response.status_code, response.text)
+
+    def _abort_chunked_upload(
+        self,
+        session: requests.Session,
+        url: str,
+        upload_id: str,
+        request_args: Dict[str, Any],
+    ) -> None:
+        """
+        Best-effort S3 AbortMultipartUpload so the server discards the parts
+        already stored; failures are logged and otherwise ignored
+        """
+        try:
+            response = session.delete(url, params={"uploadId": upload_id}, **request_args)
+        except requests.exceptions.RequestException as e:
+            log.warning(
+                "Could not abort chunked upload %s: %s",
+                upload_id,
+                self._sanitize_error_message(str(e)),
+            )
+            return
+
+        if not 200 <= response.status_code < 300:
+            log.warning(
+                "Could not abort chunked upload %s: HTTP %s", upload_id, response.status_code
+            )
+
+    def _request_with_retries(
+        self,
+        session: requests.Session,
+        step: str,
+        method: str,
+        url: str,
+        retry_count: int,
+        retry_delay: int,
+        max_backoff: int,
+        deadline: float,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """
+        Send one request of a chunked upload with the node's retry policy
 
-        # Attempt upload with configurable retries
+        Returns the first 2xx response, or raises _ChunkedUploadError once
+        all attempts have failed or another one can't finish before deadline
+        """
         last_error = None
+        attempts = 0
+        body = kwargs.get("data")
+        body_size = len(body) if body is not None else 0
 
         for attempt in range(retry_count):
             try:
-                # Add progressive delay between retries (except first attempt)
+                # Add exponential backoff between retries (except first attempt)
                 if attempt > 0:
-                    time.sleep(retry_delay * attempt)
-
-                # Prepare file for multipart upload
-                with open(file_path, "rb") as f:
-                    files_data = {upload_field_name: (filename, f, mime_type)}
-
-                    # Make HTTP request
-                    if method.upper() == "POST":
-                        response = requests.post(
-                            url,
-                            files=files_data,
-                            headers=parsed_headers,
-                            timeout=timeout,
-                            verify=system_ca_bundle if system_ca_bundle else True,
-                        )
-                    else:  # PUT
-                        response = requests.put(
-                            url,
-                            files=files_data,
-                            headers=parsed_headers,
-                            timeout=timeout,
-                            verify=system_ca_bundle if system_ca_bundle else True,
-                        )
+                    delay = _backoff_delay(attempt, retry_delay, max_backoff)
+
+                    # Give up once another attempt can't plausibly finish within the budget
+                    estimated_time = delay + self._estimated_send_time(url, body_size)
+                    if time.monotonic() + estimated_time > deadline:
+                        last_error = f"{last_error} (retry budget exhausted)"
+                        break
+
+                    time.sleep(delay)
+
+                attempts += 1
+                attempt_started = time.monotonic()
+                response = session.request(method, url, **kwargs)
 
-                # Check if response indicates success (2xx status codes)
                 if 200 <= response.status_code < 300:
-                    return (response.status_code, response.text)
-                else:
-                    # Treat HTTP errors as failures that should trigger retry
-                    last_error = f"HTTP {response.status_code}: {response.text[:200]}"
-                    continue
+                    self._record_bandwidth(url, body_size, time.monotonic() - attempt_started)
+                    return response
+
+                last_error = f"HTTP {response.status_code}: {response.text[:200]}"
+                if not _is_retryable_status(response.status_code):
+                    break
 
             except requests.exceptions.Timeout:
-                last_error = f"Request timeout after {timeout} seconds"
+                last_error = f"Request timeout after {kwargs.get('timeout')} seconds"
             except requests.exceptions.ConnectionError:
                 last_error = f"Connection error: Unable to connect to {url}"
             except requests.exceptions.RequestException as e:
-                # Sanitize error message to avoid exposing sensitive information
                 last_error = f"HTTP request error: {self._sanitize_error_message(str(e))}"
-            except Exception as e:
-                last_error = f"Unexpected error: {self._sanitize_error_message(str(e))}"
+                break
 
-        # If we get here, all retries failed - log ERROR with full filepath
-        error_msg = f"Upload failed after {retry_count} attempts - {last_error}"
-        print(f"ERROR: Failed to upload file: {file_path} - {error_msg}")
-        return (500, error_msg)
+        raise _ChunkedUploadError(f"{step} failed after {attempts} attempts - {last_error}")
 
     def _parse_headers_securely(self, headers: str, secret_headers_file: str) -> Dict[str, str]:
         """
@@ -224,35 +604,35 @@ class MultipartFileHTTPUploadNode:
         """
         Parse headers from either JSON string or multiline key:value format
         """
-        if not headers.strip():
-            return {}
+        # Callers merge into the result, so hand out a copy of the cached parse
+        return dict(self._parse_headers_cached(headers))
 
-        parsed_headers = {}
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _parse_headers_cached(headers: str) -> Dict[str, str]:
         headers_text = headers.strip()
+        if not headers_text:
+            return {}
 
-        # Try to parse as JSON first
-        try:
-            if headers_text.startswith("{") and headers_text.endswith("}"):
-                parsed_headers = json.loads(headers_text)
-                if isinstance(parsed_headers, dict):
-                    return parsed_headers
-        except json.JSONDecodeError:
-            pass
+        # Try to parse as JSON first; only brace-wrapped text can be a JSON object
+        if headers_text[0] == "{" and headers_text[-1] == "}":
+            try:
+                return json.loads(headers_text)
+            except ValueError:
+                pass
+
+        parsed_headers = {}
 
         # Parse as multiline key:value format
-        for line in headers_text.split("\n"):
-            line = line.strip()
-            if not line or ":" not in line:
+        for line in headers_text.splitlines():
+            key, sep, value = line.partition(":")
+            if not sep:
                 continue
 
-            try:
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip()
-                if key and value:
-                    parsed_headers[key] = value
-            except ValueError:
-                continue
+            key = key.strip()
+            value = value.strip()
+            if key and value:
+                parsed_headers[key] = value
 
         return parsed_headers
 
@@ -262,8 +642,14 @@ class MultipartFileHTTPUploadNode:
         Returns empty dict if file doesn't exist or can't be parsed
         """
         try:
-            if not os.path.exists(secret_file_path):
-                raise FileNotFoundError(f"Secret headers file not found: {secret_file_path}")
+            # Reuse the last parse while the file is unchanged
+            stat = os.stat(secret_file_path)
+            file_version = (stat.st_mtime_ns, stat.st_size)
+
+            with self._secrets_lock:
+                cached = self._secrets_cache.get(secret_file_path)
+            if cached is not None and cached[0] == file_version:
+                return dict(cached[1])
 
             with open(secret_file_path, "r", encoding="utf-8") as f:
                 secret_data = json.load(f)
@@ -272,7 +658,11 @@ class MultipartFileHTTPUploadNode:
                 raise ValueError("Secret headers file must contain a JSON object")
 
             # Ensure all keys and values are strings
-            return {str(k): str(v) for k, v in secret_data.items()}
+            secret_headers = {str(k): str(v) for k, v in secret_data.items()}
+
+            with self._secrets_lock:
+                self._secrets_cache[secret_file_path] = (file_version, secret_headers)
+            return dict(secret_headers)
 
         except Exception as e:
             # Re-raise with sanitized message
@@ -282,27 +672,5 @@ class MultipartFileHTTPUploadNode:
         """
         Sanitize error messages to avoid exposing sensitive information
         """
-        # Remove common sensitive patterns
-        sensitive_patterns = [
-            "Authorization:",
-            "Bearer ",
-            "api-key:",
-            "x-api-key:",
-            "token:",
-            "password:",
-            "secret:",
-        ]
-
-        sanitized_msg = error_msg
-        for pattern in sensitive_patterns:
-            # Replace the pattern and everything after it on the same line with [REDACTED]
-            if pattern.lower() in sanitized_msg.lower():
-                # Find the position and redact from there to end of line
-                lines = sanitized_msg.split('\n')
-                for i, line in enumerate(lines):
-                    if pattern.lower() in line.lower():
-                        idx = line.lower().find(pattern.lower())
-                        lines[i] = line[:idx] + "[REDACTED]"
-                sanitized_msg = '\n'.join(lines)
-
-        return sanitized_msg
+        # Keep each matched pattern and replace everything after it on the same line
+        return _REDACT_RE.sub(lambda match: match.group(1) + "[REDACTED]", error_msg)